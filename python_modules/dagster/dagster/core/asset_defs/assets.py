@@ -107,6 +107,8 @@ def __init__(
             for output_name, asset_key in keys_by_output_name.items()
         }
 
+        self._cached_source_assets: Optional[Sequence[SourceAsset]] = None
+
     def __call__(self, *args, **kwargs):
         from dagster.core.definitions.decorators.solid_decorator import DecoratedSolidFunction
 
@@ -489,6 +491,11 @@ def subset_for(self, selected_asset_keys: AbstractSet[AssetKey]) -> "AssetsDefin
         )
 
     def to_source_assets(self) -> Sequence[SourceAsset]:
+        if self._cached_source_assets is None:
+            self._cached_source_assets = self._build_source_assets()
+        return self._cached_source_assets
+
+    def _build_source_assets(self) -> Sequence[SourceAsset]:
         result = []
         for output_name, asset_key in self.keys_by_output_name.items():
             # This could maybe be sped up by batching
@@ -1,7 +1,20 @@
-from collections import defaultdict
-from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple, Union
-
-from toposort import CircularDependencyError, toposort
+import sys
+from collections import defaultdict, deque
+from typing import (
+    AbstractSet,
+    Any,
+    DefaultDict,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 
 import dagster._check as check
 from dagster.core.definitions.asset_layer import AssetLayer
@@ -89,25 +102,26 @@ def asset2(asset1):
     partitions_def = partitions_def or build_job_partitions_from_assets(assets)
 
     resource_defs = check.opt_mapping_param(resource_defs, "resource_defs")
-    resource_defs = merge_dicts({DEFAULT_IO_MANAGER_KEY: default_job_io_manager}, resource_defs)
+    resource_defs = {DEFAULT_IO_MANAGER_KEY: default_job_io_manager, **resource_defs}
 
-    # turn any AssetsDefinitions into SourceAssets
+    # turn any AssetsDefinitions into SourceAssets. source_assets has already been checked to only
+    # contain SourceAssets and AssetsDefinitions, so a single isinstance check is enough
     resolved_source_assets: List[SourceAsset] = []
-    for asset in source_assets or []:
+    for asset in source_assets:
         if isinstance(asset, AssetsDefinition):
             resolved_source_assets += asset.to_source_assets()
-        elif isinstance(asset, SourceAsset):
+        else:
             resolved_source_assets.append(asset)
 
     resolved_asset_deps = ResolvedAssetDependencies(assets, resolved_source_assets)
-    deps, assets_defs_by_node_handle = build_node_deps(assets, resolved_asset_deps)
 
-    # attempt to resolve cycles using multi-asset subsetting
-    if _has_cycles(deps):
-        assets = _attempt_resolve_cycles(assets, resolved_source_assets)
+    # attempt to resolve cycles using multi-asset subsetting, before building the node deps so
+    # that they only need to be built once
+    if _has_cycles(assets, resolved_asset_deps):
+        assets = _attempt_resolve_cycles(assets, resolved_asset_deps)
         resolved_asset_deps = ResolvedAssetDependencies(assets, resolved_source_assets)
 
-        deps, assets_defs_by_node_handle = build_node_deps(assets, resolved_asset_deps)
+    deps, assets_defs_by_node_handle = build_node_deps(assets, resolved_asset_deps)
 
     graph = GraphDefinition(
         name=name,
@@ -139,14 +153,19 @@ def asset2(asset1):
 def build_job_partitions_from_assets(
     assets: Iterable[AssetsDefinition],
 ) -> Optional[PartitionsDefinition]:
-    assets_with_partitions_defs = [assets_def for assets_def in assets if assets_def.partitions_def]
-
-    if len(assets_with_partitions_defs) == 0:
-        return None
+    first_assets_with_partitions_def: Optional[AssetsDefinition] = None
+    for assets_def in assets:
+        partitions_def = assets_def.partitions_def
+        if partitions_def is None:
+            continue
+        if first_assets_with_partitions_def is None:
+            first_assets_with_partitions_def = assets_def
+            continue
 
-    first_assets_with_partitions_def: AssetsDefinition = assets_with_partitions_defs[0]
-    for assets_def in assets_with_partitions_defs:
-        if assets_def.partitions_def != first_assets_with_partitions_def.partitions_def:
+        # most assets in a job share the same PartitionsDefinition object, so check identity
+        # before falling back to equality
+        first_partitions_def = first_assets_with_partitions_def.partitions_def
+        if partitions_def is not first_partitions_def and partitions_def != first_partitions_def:
             first_asset_key = next(iter(assets_def.keys)).to_string()
             second_asset_key = next(iter(first_assets_with_partitions_def.keys)).to_string()
             raise DagsterInvalidDefinitionError(
@@ -155,6 +174,9 @@ def build_job_partitions_from_assets(
                 f"'{second_asset_key}' have different partitions definitions. "
             )
 
+    if first_assets_with_partitions_def is None:
+        return None
+
     return first_assets_with_partitions_def.partitions_def
 
 
@@ -166,7 +188,7 @@ def build_node_deps(
     Mapping[NodeHandle, AssetsDefinition],
 ]:
     # sort so that nodes get a consistent name
-    assets_defs = sorted(assets_defs, key=lambda ad: (sorted((ak for ak in ad.keys))))
+    assets_defs = sorted(assets_defs, key=lambda ad: sorted(ad.keys))
 
     # if the same graph/op is used in multiple assets_definitions, their invocations must have
     # different names. we keep track of definitions that share a name and add a suffix to their
@@ -174,30 +196,34 @@ def build_node_deps(
     collisions: Dict[str, int] = {}
     assets_defs_by_node_handle: Dict[NodeHandle, AssetsDefinition] = {}
     node_alias_and_output_by_asset_key: Dict[AssetKey, Tuple[str, str]] = {}
+    deps: Dict[Union[str, NodeInvocation], Dict[str, IDependencyDefinition]] = {}
+    # the dependency dict of each node, alongside its AssetsDefinition, so that inputs can be
+    # connected once every output has been indexed
+    node_deps_and_assets_defs: List[Tuple[Dict[str, IDependencyDefinition], AssetsDefinition]] = []
     for assets_def in assets_defs:
         node_name = assets_def.node_def.name
-        if collisions.get(node_name):
-            collisions[node_name] += 1
-            node_alias = f"{node_name}_{collisions[node_name]}"
-        else:
-            collisions[node_name] = 1
-            node_alias = node_name
+        collision_count = collisions.get(node_name, 0) + 1
+        collisions[node_name] = collision_count
+        # generated aliases are fresh strings that end up as keys in many dicts and handles, so
+        # intern them to let those lookups short-circuit on identity
+        node_alias = (
+            node_name if collision_count == 1 else sys.intern(f"{node_name}_{collision_count}")
+        )
 
         # unique handle for each AssetsDefinition
         assets_defs_by_node_handle[NodeHandle(node_alias, parent=None)] = assets_def
         for output_name, key in assets_def.keys_by_output_name.items():
             node_alias_and_output_by_asset_key[key] = (node_alias, output_name)
 
-    deps: Dict[Union[str, NodeInvocation], Dict[str, IDependencyDefinition]] = {}
-    for node_handle, assets_def in assets_defs_by_node_handle.items():
         # the key that we'll use to reference the node inside this AssetsDefinition
-        node_def_name = assets_def.node_def.name
-        if node_handle.name != node_def_name:
-            node_key = NodeInvocation(node_def_name, alias=node_handle.name)
+        if node_alias != node_name:
+            node_key: Union[str, NodeInvocation] = NodeInvocation(node_name, alias=node_alias)
         else:
-            node_key = node_def_name
+            node_key = node_name
         deps[node_key] = {}
+        node_deps_and_assets_defs.append((deps[node_key], assets_def))
 
+    for node_deps, assets_def in node_deps_and_assets_defs:
         # connect each input of this AssetsDefinition to the proper upstream node
         for input_name in assets_def.input_names:
             upstream_asset_key = resolved_asset_deps.get_resolved_asset_key_for_input(
@@ -207,38 +233,123 @@ def build_node_deps(
                 upstream_node_alias, upstream_output_name = node_alias_and_output_by_asset_key[
                     upstream_asset_key
                 ]
-                deps[node_key][input_name] = DependencyDefinition(
+                node_deps[input_name] = DependencyDefinition(
                     upstream_node_alias, upstream_output_name
                 )
 
     return deps, assets_defs_by_node_handle
 
 
-def _has_cycles(deps: Dict[Union[str, NodeInvocation], Dict[str, IDependencyDefinition]]) -> bool:
-    """Detect if there are cycles in a dependency dictionary."""
-    try:
-        node_deps: Dict[Union[str, NodeInvocation], Set[str]] = {}
-        for upstream_node, downstream_deps in deps.items():
-            node_deps[upstream_node] = set()
-            for dep in downstream_deps.values():
-                if isinstance(dep, DependencyDefinition):
-                    node_deps[upstream_node].add(dep.node)
-                else:
-                    check.failed(f"Unexpected dependency type {type(dep)}.")
-        # make sure that there is a valid topological sorting of these node dependencies
-        list(toposort(node_deps))
-        return False
-    # only try to resolve cycles if we have a cycle
-    except CircularDependencyError:
-        return True
+def _has_cycles(
+    assets_defs: Iterable[AssetsDefinition], resolved_asset_deps: ResolvedAssetDependencies
+) -> bool:
+    """Detect if there are cycles between the nodes that the given AssetsDefinitions would be
+    invoked as, i.e. the dependencies that build_node_deps would produce.
+
+    Uses Kahn's algorithm: nodes are repeatedly removed once all of their upstream nodes have been
+    removed. If any node is never removed, it must be part of a cycle.
+    """
+    assets_defs = list(assets_defs)
+    node_index_by_asset_key: Dict[AssetKey, int] = {}
+    for index, assets_def in enumerate(assets_defs):
+        for key in assets_def.keys:
+            node_index_by_asset_key[key] = index
+
+    in_degree: List[int] = [0] * len(assets_defs)
+    successors: List[List[int]] = [[] for _ in assets_defs]
+    for index, assets_def in enumerate(assets_defs):
+        for input_name in assets_def.input_names:
+            upstream_index = node_index_by_asset_key.get(
+                resolved_asset_deps.get_resolved_asset_key_for_input(assets_def, input_name)
+            )
+            if upstream_index is not None:
+                in_degree[index] += 1
+                successors[upstream_index].append(index)
+
+    queue: Deque[int] = deque(index for index, degree in enumerate(in_degree) if degree == 0)
+    processed_count = 0
+    while queue:
+        index = queue.popleft()
+        processed_count += 1
+        for successor in successors[index]:
+            in_degree[successor] -= 1
+            if in_degree[successor] == 0:
+                queue.append(successor)
+
+    return processed_count != len(assets_defs)
+
+
+def _toposort_asset_graph(upstream: Mapping[AssetKey, AbstractSet[AssetKey]]) -> List[AssetKey]:
+    """Topologically sort an asset graph, given the upstream asset keys of each asset.
+
+    Raises a DagsterInvalidDefinitionError if the graph contains a cycle.
+    """
+    in_degree: Dict[AssetKey, int] = {}
+    successors: Dict[AssetKey, List[AssetKey]] = defaultdict(list)
+    for key, upstream_keys in upstream.items():
+        in_degree.setdefault(key, 0)
+        for upstream_key in upstream_keys:
+            in_degree[key] += 1
+            in_degree.setdefault(upstream_key, 0)
+            successors[upstream_key].append(key)
+
+    queue: Deque[AssetKey] = deque(key for key, degree in in_degree.items() if degree == 0)
+    order: List[AssetKey] = []
+    while queue:
+        key = queue.popleft()
+        order.append(key)
+        for successor in successors[key]:
+            in_degree[successor] -= 1
+            if in_degree[successor] == 0:
+                queue.append(successor)
+
+    if len(order) != len(in_degree):
+        cyclic_names = sorted(
+            key.to_user_string() for key, degree in in_degree.items() if degree > 0
+        )
+        raise DagsterInvalidDefinitionError(
+            f"Circular dependencies exist between assets: {', '.join(cyclic_names)}."
+        )
+
+    return order
+
+
+def _color_asset_graph(
+    toposorted: Sequence[AssetKey],
+    upstream: Mapping[AssetKey, AbstractSet[AssetKey]],
+    downstream: Mapping[AssetKey, Sequence[AssetKey]],
+    node_asset_keys_by_key: Mapping[AssetKey, AbstractSet[AssetKey]],
+) -> Dict[AssetKey, int]:
+    """Returns a color for each asset, such that assets that are downstream of another asset via a
+    different node have a greater color than that asset.
+
+    Assets are visited in topological order, so that each asset's color is final by the time its
+    downstream assets are colored.
+    """
+    colors: Dict[AssetKey, int] = {key: 0 for key in toposorted if not upstream.get(key)}
+    for key in toposorted:
+        cur_color = colors[key]
+        # None for a SourceAsset, in which case all downstream are treated as if they're in the
+        # same node
+        cur_node_asset_keys = node_asset_keys_by_key.get(key)
+
+        for downstream_key in downstream.get(key, ()):
+            # if the downstream asset is in the current node, keep the same color
+            if cur_node_asset_keys is None or downstream_key in cur_node_asset_keys:
+                new_color = cur_color
+            else:
+                new_color = cur_color + 1
+            colors[downstream_key] = max(colors.get(downstream_key, -1), new_color)
+
+    return colors
 
 
 def _attempt_resolve_cycles(
-    assets_defs: Iterable["AssetsDefinition"], source_assets: Iterable["SourceAsset"]
-) -> Sequence["AssetsDefinition"]:
+    assets_defs: Iterable[AssetsDefinition], resolved_asset_deps: ResolvedAssetDependencies
+) -> Sequence[AssetsDefinition]:
     """
-    DFS starting at root nodes to color the asset dependency graph. Each time you leave your
-    current AssetsDefinition, the color increments.
+    Starting at root nodes, color the asset dependency graph in topological order. Each time you
+    leave your current AssetsDefinition, the color increments.
 
     At the end of this process, we'll have a coloring for the asset graph such that any asset which
     is downstream of another asset via a different AssetsDefinition will be guaranteed to have
@@ -250,60 +361,40 @@ def _attempt_resolve_cycles(
     This ensures that no asset that shares a node with another asset will be downstream of
     that asset via a different node (i.e. there will be no cycles).
     """
-    from dagster.core.selector.subset_selector import generate_asset_dep_graph
-
-    # get asset dependencies
-    asset_deps = generate_asset_dep_graph(assets_defs, source_assets)
-
-    # index AssetsDefinitions by their asset names
-    assets_defs_by_asset_name = {}
+    # index AssetsDefinitions by their asset keys, and get asset dependencies
+    assets_defs_by_asset_key: Dict[AssetKey, AssetsDefinition] = {}
+    upstream: Dict[AssetKey, AbstractSet[AssetKey]] = {}
+    downstream: Dict[AssetKey, List[AssetKey]] = defaultdict(list)
     for assets_def in assets_defs:
         for asset_key in assets_def.keys:
-            assets_defs_by_asset_name[asset_key.to_user_string()] = assets_def
-
-    # color for each asset
-    colors = {}
-
-    # recursively color an asset and all of its downstream assets
-    def _dfs(name, cur_color):
-        colors[name] = cur_color
-        if name in assets_defs_by_asset_name:
-            cur_node_asset_keys = assets_defs_by_asset_name[name].keys
-        else:
-            # in a SourceAsset, treat all downstream as if they're in the same node
-            cur_node_asset_keys = asset_deps["downstream"][name]
-
-        for downstream_name in asset_deps["downstream"][name]:
-            # if the downstream asset is in the current node,keep the same color
-            if AssetKey.from_user_string(downstream_name) in cur_node_asset_keys:
-                new_color = cur_color
-            else:
-                new_color = cur_color + 1
-
-            # if current color of the downstream asset is less than the new color, re-do dfs
-            if colors.get(downstream_name, -1) < new_color:
-                _dfs(downstream_name, new_color)
+            assets_defs_by_asset_key[asset_key] = assets_def
+            upstream_keys = resolved_asset_deps.get_resolved_upstream_asset_keys(
+                assets_def, asset_key
+            )
+            upstream[asset_key] = upstream_keys
+            for upstream_key in upstream_keys:
+                downstream[upstream_key].append(asset_key)
 
     # validate that there are no cycles in the overall asset graph
-    toposorted = list(toposort(asset_deps["upstream"]))
+    toposorted = _toposort_asset_graph(upstream)
 
-    # dfs for each root node
-    for root_name in toposorted[0]:
-        _dfs(root_name, 0)
-
-    color_mapping_by_assets_defs: Dict[AssetsDefinition, Any] = defaultdict(
-        lambda: defaultdict(set)
+    colors = _color_asset_graph(
+        toposorted,
+        upstream,
+        downstream,
+        {key: assets_def.keys for key, assets_def in assets_defs_by_asset_key.items()},
     )
-    for name, color in colors.items():
-        asset_key = AssetKey.from_user_string(name)
+
+    color_mapping_by_assets_defs: DefaultDict[
+        AssetsDefinition, DefaultDict[int, Set[AssetKey]]
+    ] = defaultdict(lambda: defaultdict(set))
+    for key, color in colors.items():
         # ignore source assets
-        if name not in assets_defs_by_asset_name:
+        if key not in assets_defs_by_asset_key:
             continue
-        color_mapping_by_assets_defs[assets_defs_by_asset_name[name]][color].add(
-            AssetKey.from_user_string(name)
-        )
+        color_mapping_by_assets_defs[assets_defs_by_asset_key[key]][color].add(key)
 
-    ret = []
+    ret: List[AssetsDefinition] = []
     for assets_def, color_mapping in color_mapping_by_assets_defs.items():
         if len(color_mapping) == 1 or not assets_def.can_subset:
             ret.append(assets_def)
@@ -320,13 +411,12 @@ def _ensure_resources_dont_conflict(
     resource_defs: Mapping[str, ResourceDefinition],
 ) -> None:
     """Ensures that resources between assets, source assets, and provided resource dictionary do not conflict."""
-    resource_defs_from_assets = {}
+    resource_defs_from_assets: Dict[str, ResourceDefinition] = {}
     all_assets: Sequence[Union[AssetsDefinition, SourceAsset]] = [*assets, *source_assets]
     for asset in all_assets:
         for resource_key, resource_def in asset.resource_defs.items():
-            if resource_key not in resource_defs_from_assets:
-                resource_defs_from_assets[resource_key] = resource_def
-            if resource_defs_from_assets[resource_key] != resource_def:
+            existing_resource_def = resource_defs_from_assets.setdefault(resource_key, resource_def)
+            if existing_resource_def is not resource_def:
                 raise DagsterInvalidDefinitionError(
                     f"Conflicting versions of resource with key '{resource_key}' "
                     "were provided to different assets. When constructing a "
@@ -334,10 +424,11 @@ def _ensure_resources_dont_conflict(
                     "match by reference equality for a given key."
                 )
     for resource_key, resource_def in resource_defs.items():
+        resource_def_from_assets = resource_defs_from_assets.get(resource_key)
         if (
             resource_key != DEFAULT_IO_MANAGER_KEY
-            and resource_key in resource_defs_from_assets
-            and resource_defs_from_assets[resource_key] != resource_def
+            and resource_def_from_assets is not None
+            and resource_def_from_assets is not resource_def
         ):
             raise DagsterInvalidDefinitionError(
                 f"resource with key '{resource_key}' provided to job "
@@ -378,5 +469,5 @@ def get_all_resource_defs(
     all_resource_defs = dict(resource_defs)
     all_assets: Sequence[Union[AssetsDefinition, SourceAsset]] = [*assets, *source_assets]
     for asset in all_assets:
-        all_resource_defs = merge_dicts(all_resource_defs, asset.resource_defs)
+        all_resource_defs.update(asset.resource_defs)
     return all_resource_defs
@@ -20,12 +20,12 @@ class ResolvedAssetDependencies:
     def __init__(
         self, assets_defs: Iterable[AssetsDefinition], source_assets: Iterable[SourceAsset]
     ):
-        self._deps_by_assets_def_id = resolve_assets_def_deps(assets_defs, source_assets)
+        self._deps_by_assets_def = resolve_assets_def_deps(assets_defs, source_assets)
 
     def get_resolved_upstream_asset_keys(
         self, assets_def: AssetsDefinition, asset_key: AssetKey
     ) -> AbstractSet[AssetKey]:
-        resolved_keys_by_unresolved_key = self._deps_by_assets_def_id.get(id(assets_def), {})
+        resolved_keys_by_unresolved_key = self._deps_by_assets_def.get(assets_def, {})
         unresolved_upstream_keys = assets_def.asset_deps[asset_key]
         return {
             resolved_keys_by_unresolved_key.get(unresolved_key, unresolved_key)
@@ -36,14 +36,14 @@ def get_resolved_asset_key_for_input(
         self, assets_def: AssetsDefinition, input_name: str
     ) -> AssetKey:
         unresolved_asset_key_for_input = assets_def.node_keys_by_input_name[input_name]
-        return self._deps_by_assets_def_id.get(id(assets_def), {}).get(
+        return self._deps_by_assets_def.get(assets_def, {}).get(
             unresolved_asset_key_for_input, unresolved_asset_key_for_input
         )
 
 
 def resolve_assets_def_deps(
     assets_defs: Iterable[AssetsDefinition], source_assets: Iterable[SourceAsset]
-) -> Mapping[int, Mapping[AssetKey, AssetKey]]:
+) -> Mapping[AssetsDefinition, Mapping[AssetKey, AssetKey]]:
     """
     For each AssetsDefinition, resolves its inputs to upstream asset keys. Matches based on either
     of two criteria:
@@ -69,13 +69,12 @@ def resolve_assets_def_deps(
 
     warned = False
 
-    result: Dict[int, Mapping[AssetKey, AssetKey]] = {}
+    result: Dict[AssetsDefinition, Mapping[AssetKey, AssetKey]] = {}
     for assets_def in assets_defs:
-        group_name = (
-            next(iter(assets_def.group_names_by_key.values()))
-            if len(assets_def.group_names_by_key) == 1
-            else None
-        )
+        # look these up once per AssetsDefinition, rather than once per input
+        keys = assets_def.keys
+        group_names = assets_def.group_names_by_key.values()
+        group_name = next(iter(group_names)) if len(group_names) == 1 else None
 
         resolved_keys_by_unresolved_key: Dict[AssetKey, AssetKey] = {}
         for input_name, upstream_key in assets_def.keys_by_input_name.items():
@@ -94,7 +93,7 @@ def resolve_assets_def_deps(
 
                 if not warned:
                     experimental_warning(
-                        f"Asset {next(iter(assets_def.keys)).to_string()}'s dependency "
+                        f"Asset {next(iter(keys)).to_string()}'s dependency "
                         f"'{upstream_key.path[-1]}' was resolved to upstream asset "
                         f"{resolved_key.to_string()}, because the name matches and they're in the same "
                         "group. This is experimental functionality that may change in a future "
@@ -108,12 +107,12 @@ def resolve_assets_def_deps(
             ):
                 raise DagsterInvalidDefinitionError(
                     f"Input asset '{upstream_key.to_string()}' for asset "
-                    f"'{next(iter(assets_def.keys)).to_string()}' is not "
+                    f"'{next(iter(keys)).to_string()}' is not "
                     "produced by any of the provided asset ops and is not one of the provided "
                     "sources"
                 )
 
         if resolved_keys_by_unresolved_key:
-            result[id(assets_def)] = resolved_keys_by_unresolved_key
+            result[assets_def] = resolved_keys_by_unresolved_key
 
     return result
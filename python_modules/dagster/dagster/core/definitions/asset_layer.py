@@ -499,6 +499,7 @@ def from_graph_and_assets_node_mapping(
         io_manager_by_asset: Dict[AssetKey, str] = {
             source_asset.key: source_asset.get_io_manager_key() for source_asset in source_assets
         }
+        partition_fn = lambda context: {context.partition_key}
         for node_handle, assets_def in assets_defs_by_node_handle.items():
             for key in assets_def.keys:
                 asset_deps[key] = resolved_asset_deps.get_resolved_upstream_asset_keys(
@@ -510,12 +511,14 @@ def from_graph_and_assets_node_mapping(
                     assets_def, input_name
                 )
                 asset_key_by_input[NodeInputHandle(node_handle, input_name)] = resolved_asset_key
-                # resolve graph input to list of op inputs that consume it
-                node_input_handles = _resolve_input_to_destinations(
-                    input_name, assets_def.node_def, node_handle
-                )
-                for node_input_handle in node_input_handles:
-                    asset_key_by_input[node_input_handle] = resolved_asset_key
+                # resolve graph input to list of op inputs that consume it. for an op, that's just
+                # the input handle recorded above
+                if isinstance(assets_def.node_def, GraphDefinition):
+                    node_input_handles = _resolve_input_to_destinations(
+                        input_name, assets_def.node_def, node_handle
+                    )
+                    for node_input_handle in node_input_handles:
+                        asset_key_by_input[node_input_handle] = resolved_asset_key
 
             for output_name, asset_key in assets_def.node_keys_by_output_name.items():
                 # resolve graph output to the op output it comes from
@@ -523,7 +526,6 @@ def from_graph_and_assets_node_mapping(
                     output_name, handle=node_handle
                 )
                 node_output_handle = NodeOutputHandle(inner_node_handle, inner_output_def.name)
-                partition_fn = lambda context: {context.partition_key}
                 asset_info_by_output[node_output_handle] = AssetOutputInfo(
                     asset_key,
                     partitions_fn=partition_fn if assets_def.partitions_def else None,
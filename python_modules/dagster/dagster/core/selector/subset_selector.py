@@ -106,21 +106,30 @@ def generate_asset_dep_graph(
 
     resolved_asset_deps = ResolvedAssetDependencies(assets_defs, source_assets)
 
+    # each asset key is converted to its name once, no matter how many edges it appears in
+    asset_names_by_key: Dict[AssetKey, str] = {}
+
+    def _asset_name(asset_key: AssetKey) -> str:
+        asset_name = asset_names_by_key.get(asset_key)
+        if asset_name is None:
+            asset_name = asset_names_by_key[asset_key] = asset_key.to_user_string()
+        return asset_name
+
     upstream: Dict[str, Set[str]] = {}
     downstream: Dict[str, Set[str]] = {}
     for assets_def in assets_defs:
         for asset_key in assets_def.keys:
-            asset_name = asset_key.to_user_string()
+            asset_name = _asset_name(asset_key)
             upstream[asset_name] = set()
-            downstream[asset_name] = downstream.get(asset_name, set())
+            downstream.setdefault(asset_name, set())
             # for each asset upstream of this one, set that as upstream, and this downstream of it
             upstream_asset_keys = resolved_asset_deps.get_resolved_upstream_asset_keys(
                 assets_def, asset_key
             )
             for upstream_key in upstream_asset_keys:
-                upstream_name = upstream_key.to_user_string()
+                upstream_name = _asset_name(upstream_key)
                 upstream[asset_name].add(upstream_name)
-                downstream[upstream_name] = downstream.get(upstream_name, set()) | {asset_name}
+                downstream.setdefault(upstream_name, set()).add(asset_name)
     return freeze_graph({"upstream": upstream, "downstream": downstream})
 
 
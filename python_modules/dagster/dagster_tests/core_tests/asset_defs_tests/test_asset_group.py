@@ -805,8 +805,6 @@ def foo_prime(context, a, b):
 
 
 def test_cycle_resolution_impossible():
-    from toposort import CircularDependencyError
-
     @asset
     def a(s, c):
         return s + c
@@ -820,7 +818,7 @@ def c(b):
         return b + 1
 
     s = SourceAsset(key="s")
-    with pytest.raises(CircularDependencyError):
+    with pytest.raises(DagsterInvalidDefinitionError, match="Circular dependencies exist"):
         AssetGroup([a, b, c], source_assets=[s]).build_job("job")
 
 